@@ -1,10 +1,56 @@
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 import requests
 import json
 import time
 import os
+import threading
 from datetime import datetime
 import logging
+import logging.handlers
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from urllib.parse import parse_qs, urlparse
+
+# Maximum number of API pages fetched at the same time
+MAX_PAGE_WORKERS = 5
+# Users per page requested from the API (the maximum GitHub allows)
+PER_PAGE = 100
+# Number of recent history events shown in the stats view
+RECENT_HISTORY = 5
+# The history log is compacted to its last MAX_HISTORY_EVENTS events once it
+# grows past MAX_HISTORY_BYTES
+MAX_HISTORY_EVENTS = 2000
+MAX_HISTORY_BYTES = 2_000_000
+# Below this many remaining API requests, requests are spaced out until the reset
+RATE_LIMIT_THRESHOLD = 10
+# After a full check, checkChanges only re-walks the followers within this many
+# seconds if the profile's follower count has changed
+COUNT_PROBE_WINDOW = 300
+# Number of log records buffered before they are written to the log file
+LOG_BUFFER_SIZE = 100
+# Data files are only read by the tracker, so skip the whitespace
+JSON_SEPARATORS = (',', ':')
+
+def configureLogging(logFile):
+    """Send log records to a file, batched through an in-memory buffer.
+    
+    Records are written LOG_BUFFER_SIZE at a time, or immediately once an
+    error is logged. Does nothing if logging is already configured.
+    
+    Args:
+        logFile (str): Path of the log file.
+    """
+    root = logging.getLogger()
+    if root.handlers:
+        return
+    fileHandler = logging.FileHandler(logFile)
+    fileHandler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+    root.addHandler(logging.handlers.MemoryHandler(LOG_BUFFER_SIZE, flushLevel=logging.ERROR,
+                                                   target=fileHandler))
+    root.setLevel(logging.INFO)
 
 class GitHubTracker:
     """A class to track GitHub followers, unfollowers, and non-mutual following."""
@@ -21,98 +67,246 @@ class GitHubTracker:
         """
         if not username or not isinstance(username, str):
             raise ValueError("Username must be a non-empty string")
+        
+        # Before any logging call, which would otherwise configure a stderr handler
+        configureLogging(f"{username}_tracker.log")
+        
         if token and not (isinstance(token, str) and len(token) >= 40):
             logging.warning("Token format looks invalid. Expected a 40-character string.")
         
         self.username = username
         self.headers = {'Authorization': f'token {token}'} if token else {}
-        self.followersFile = f"{username}_followers.json"
-        self.historyFile = f"{username}_history.json"
         
-        # Set up logging
-        logging.basicConfig(level=logging.INFO, filename=f"{username}_tracker.log",
-                            format="%(asctime)s - %(levelname)s - %(message)s")
+        # One pooled session so every page reuses the same TLS connections
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.headers['Accept'] = 'application/vnd.github+json'
+        # Once retries run out, hand back the last response instead of raising RetryError
+        retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[502, 503, 504], raise_on_status=False)
+        # Followers and following may be walked at the same time
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=2 * MAX_PAGE_WORKERS, max_retries=retry)
+        self.session.mount('https://', adapter)
+        
+        # Page URLs of each user list; only the page number is appended per request
+        self.pageUrls = {
+            kind: f"https://api.github.com/users/{username}/{kind}?per_page={PER_PAGE}&page="
+            for kind in ("followers", "following")
+        }
         
-        self.initializeDataFiles()
-    
-    def initializeDataFiles(self):
-        """Create data files if they don't exist."""
-        if not os.path.exists(self.followersFile):
-            with open(self.followersFile, 'w') as f:
-                json.dump([], f)
+        self.followersFile = f"{username}_followers.json"
+        self.historyFile = f"{username}_history.jsonl"
+        self.statsFile = f"{username}_stats.json"
+        self.pageCacheFiles = {
+            "followers": f"{username}_followers_cache.json",
+            "following": f"{username}_following_cache.json"
+        }
         
-        if not os.path.exists(self.historyFile):
-            with open(self.historyFile, 'w') as f:
-                json.dump({"newFollowers": [], "unfollowers": []}, f)
+        # Saved state is read once here and kept in sync by checkChanges.
+        # Missing files read as empty state and are created on first save.
+        self.previousFollowers = self.loadPreviousFollowers()
+        self.historyStats = self.loadStats()
+        self.pageCaches = {kind: self.loadPageCache(kind) for kind in self.pageCacheFiles}
+        
+        # (fetch time, users) of the last successful fetch of each list
+        self.userCaches = {kind: None for kind in self.pageUrls}
+        self.ttlSeconds = 60
+        # Time of the last full follower walk in checkChanges
+        self.lastFullCheck = 0
+        
+        # Single background thread for data file writes
+        self.ioPool = ThreadPoolExecutor(max_workers=1)
+        # Serialises the spaced-out requests made while the rate limit is low
+        self.rateLimitLock = threading.Lock()
+    
+    def close(self):
+        """Wait for queued data file writes to finish."""
+        self.ioPool.shutdown(wait=True)
     
     def check_rate_limit(self, response):
-        """Check GitHub API rate limits and sleep if necessary."""
+        """Check GitHub API rate limits and sleep if necessary.
+        
+        Once the remaining budget is low, the requests left are spread evenly
+        over the time until the limit resets. The page workers take turns
+        through rateLimitLock so together they keep to that spacing. With no
+        requests left, this sleeps until the reset.
+        """
         remaining = int(response.headers.get('X-RateLimit-Remaining', 0))
         reset_time = int(response.headers.get('X-RateLimit-Reset', 0))
-        if remaining < 10:
+        if remaining >= RATE_LIMIT_THRESHOLD:
+            return
+        
+        if remaining == 0:
             sleep_time = reset_time - time.time() + 1
+            if sleep_time > 0:
+                logging.info(f"Rate limit exhausted, sleeping for {sleep_time} seconds...")
+                time.sleep(sleep_time)
+            return
+        
+        with self.rateLimitLock:
+            # Worked out after taking the lock, since waiting for it uses up time
+            sleep_time = (reset_time - time.time()) / remaining
             if sleep_time > 0:
                 logging.info(f"Rate limit low ({remaining} remaining), sleeping for {sleep_time} seconds...")
                 time.sleep(sleep_time)
     
-    def getFollowers(self):
-        """Fetch all followers from GitHub API.
+    def waitForBudget(self, response, requestsNeeded):
+        """Wait for the rate limit reset if the budget can't cover the next requests.
         
-        Returns:
-            list: List of follower dictionaries with login, id, avatar_url, and html_url.
+        Called before fanning out the remaining pages of a walk, so a walk
+        that would run out partway through waits once up front instead.
+        
+        Args:
+            response (requests.Response): The most recent API response.
+            requestsNeeded (int): Number of requests about to be made.
         """
-        followers = []
-        page = 1
+        remaining = int(response.headers.get('X-RateLimit-Remaining', requestsNeeded))
+        if remaining >= requestsNeeded:
+            return
+        sleep_time = int(response.headers.get('X-RateLimit-Reset', 0)) - time.time() + 1
+        if sleep_time > 0:
+            logging.info(f"{requestsNeeded} requests needed but {remaining} remaining, sleeping for {sleep_time} seconds...")
+            time.sleep(sleep_time)
+    
+    def fetchPage(self, url, etag=None):
+        """Fetch a single API page and apply rate limit handling.
         
-        while True:
-            url = f"https://api.github.com/users/{self.username}/followers?page={page}&per_page=100"
-            response = requests.get(url, headers=self.headers)
-            
+        Args:
+            url (str): The full page URL.
+            etag (str, optional): ETag of the cached page. When given, the request
+                is conditional and GitHub answers 304 if the page is unchanged.
+        
+        Returns:
+            requests.Response: The API response, or None if the request failed.
+        """
+        headers = {'If-None-Match': etag} if etag else None
+        try:
+            response = self.session.get(url, headers=headers)
             self.check_rate_limit(response)
             
-            if response.status_code != 200:
-                if response.status_code == 403:
-                    logging.error("Rate limit exceeded. Try using a token or waiting.")
-                    st.error("Rate limit exceeded. Try using a token or waiting.")
-                elif response.status_code == 401:
-                    logging.error("Invalid token. Please check your GitHub token.")
-                    st.error("Invalid token. Please check your GitHub token.")
-                else:
-                    logging.error(f"Error getting followers: {response.status_code} - {response.text}")
-                    st.error(f"Error getting followers: {response.status_code}")
-                return []
-            
-            pageFollowers = response.json()
-            if not pageFollowers:
-                break
-                
-            followers.extend([{
-                'login': user['login'],
-                'id': user['id'],
-                'avatarUrl': user['avatar_url'],
-                'htmlUrl': user['html_url']
-            } for user in pageFollowers])
-            
-            page += 1
-            time.sleep(1)
+            if response.status_code == 403 and response.headers.get('X-RateLimit-Remaining') == '0':
+                # check_rate_limit has already waited for the reset
+                response = self.session.get(url, headers=headers)
+                self.check_rate_limit(response)
+        except requests.RequestException as e:
+            logging.error(f"Request to {url} failed: {e}")
+            return None
+        return response
+    
+    def getLastPage(self, response, default=1):
+        """Read the last page number from a response's Link header.
+        
+        Returns:
+            int: The last page number, or default if the response has no "last" link.
+        """
+        last = response.links.get('last')
+        if not last:
+            return default
+        return int(parse_qs(urlparse(last['url']).query)['page'][0])
+    
+    def getFollowerCount(self):
+        """Fetch the user's follower count from their profile.
         
-        logging.info(f"Fetched {len(followers)} followers for {self.username}")
-        return followers
+        Returns:
+            int: The follower count, or None if the request failed.
+        """
+        response = self.fetchPage(f"https://api.github.com/users/{self.username}")
+        if response is None:
+            return None
+        if response.status_code != 200:
+            logging.error(f"Error getting profile: {response.status_code} - {response.text}")
+            return None
+        return json.loads(response.content)['followers']
+    
+    def getFollowers(self):
+        """Get all followers, reusing a recent fetch when there is one.
+        
+        Returns:
+            list: List of follower dictionaries with login, id, avatar_url, and html_url,
+                  or None if fetching failed and there is no earlier result.
+        """
+        return self.getUsers("followers")
     
     def getFollowing(self):
-        """Fetch all users the target user is following.
+        """Get all users the target user is following, reusing a recent fetch.
         
         Returns:
-            list: List of following user dictionaries with login, id, avatar_url, and html_url.
+            list: List of following user dictionaries with login, id, avatar_url, and html_url,
+                  or None if fetching failed and there is no earlier result.
         """
-        following = []
-        page = 1
+        return self.getUsers("following")
+    
+    def getUsers(self, kind):
+        """Get one of the user's lists, reusing a recent fetch when there is one.
         
-        while True:
-            url = f"https://api.github.com/users/{self.username}/following?page={page}&per_page=100"
-            response = requests.get(url, headers=self.headers)
+        A successful fetch is reused for ttlSeconds. If fetching fails, the last
+        successful result is returned so callers don't see everyone as gone.
+        
+        Args:
+            kind (str): Either "followers" or "following".
+        
+        Returns:
+            list: List of user dictionaries with login, id, avatarUrl, and htmlUrl,
+                  or None if fetching failed and there is no earlier result.
+        """
+        cached = self.userCaches[kind]
+        if cached and time.time() - cached[0] < self.ttlSeconds:
+            return cached[1]
+        
+        users = self.paginate(kind)
+        if users is None:
+            return cached[1] if cached else None
+        
+        self.userCaches[kind] = (time.time(), users)
+        return users
+    
+    def paginate(self, kind):
+        """Fetch all pages of one of the user's lists from GitHub API.
+        
+        The first page is fetched alone to learn the page count from its Link
+        header, then the remaining pages are fetched concurrently. Pages are
+        requested conditionally with their cached ETag, so unchanged pages come
+        back as an empty 304 and are served from the page cache.
+        
+        Args:
+            kind (str): Either "followers" or "following".
+        
+        Returns:
+            list: List of user dictionaries, or None if a request failed.
+        """
+        url = self.pageUrls[kind]
+        pageCache = self.pageCaches[kind]
+        
+        def fetch(page):
+            return self.fetchPage(url + str(page), pageCache.get(str(page), {}).get('etag'))
+        
+        responses = [fetch(1)]
+        
+        if responses[0] is not None and responses[0].status_code in (200, 304):
+            # A 304 may omit the Link header; the cached page count is then used
+            pageCountKnown = 'last' in responses[0].links or responses[0].status_code == 200
+            lastPage = self.getLastPage(responses[0], len(pageCache) if responses[0].status_code == 304 else 1)
+            # Conditional requests answered with 304 don't use up the budget
+            self.waitForBudget(responses[0], sum(1 for page in range(2, lastPage + 1)
+                                                 if str(page) not in pageCache))
+            with ThreadPoolExecutor(max_workers=MAX_PAGE_WORKERS) as executor:
+                responses.extend(executor.map(fetch, range(2, lastPage + 1)))
             
-            self.check_rate_limit(response)
+            if not pageCountKnown:
+                # The list may have grown past the cached pages, so keep going
+                # one page at a time while the last page is full
+                while self.pageLength(responses[-1], pageCache, len(responses)) == PER_PAGE:
+                    responses.append(fetch(len(responses) + 1))
+        
+        users = []
+        cacheChanged = False
+        for page, response in enumerate(responses, start=1):
+            if response is None:
+                st.error(f"Error getting {kind}: the request to GitHub failed")
+                return None
+            
+            if response.status_code == 304:
+                users.extend(pageCache[str(page)]['users'])
+                continue
             
             if response.status_code != 200:
                 if response.status_code == 403:
@@ -122,101 +316,349 @@ class GitHubTracker:
                     logging.error("Invalid token. Please check your GitHub token.")
                     st.error("Invalid token. Please check your GitHub token.")
                 else:
-                    logging.error(f"Error getting following: {response.status_code} - {response.text}")
-                    st.error(f"Error getting following: {response.status_code}")
-                return []
+                    logging.error(f"Error getting {kind}: {response.status_code} - {response.text}")
+                    st.error(f"Error getting {kind}: {response.status_code}")
+                return None
             
-            pageFollowing = response.json()
-            if not pageFollowing:
-                break
-                
-            following.extend([{
+            pageUsers = [{
                 'login': user['login'],
                 'id': user['id'],
                 'avatarUrl': user['avatar_url'],
                 'htmlUrl': user['html_url']
-            } for user in pageFollowing])
-            
-            page += 1
-            time.sleep(1)
+            } for user in json.loads(response.content)]
+            pageCache[str(page)] = {'etag': response.headers.get('ETag'), 'users': pageUsers}
+            cacheChanged = True
+            users.extend(pageUsers)
+        
+        stalePages = [page for page in pageCache if int(page) > len(responses)]
+        for page in stalePages:
+            del pageCache[page]
+        if cacheChanged or stalePages:
+            self.savePageCache(kind, pageCache)
+        
+        logging.info(f"Fetched {len(users)} {kind} for {self.username}")
+        return users
+    
+    def pageLength(self, response, pageCache, page):
+        """Count the users on a fetched page.
+        
+        Args:
+            response (requests.Response): The page's response, or None if the request failed.
+            pageCache (dict): The page cache of the list being walked.
+            page (int): The page number.
         
-        logging.info(f"Fetched {len(following)} following for {self.username}")
-        return following
+        Returns:
+            int: Number of users on the page, or 0 if the request failed.
+        """
+        if response is None:
+            return 0
+        if response.status_code == 304:
+            return len(pageCache[str(page)]['users'])
+        if response.status_code == 200:
+            return len(json.loads(response.content))
+        return 0
     
     def getNonMutualFollowing(self):
         """Find users that the target user follows but who don't follow back.
         
+        The following list is fetched on a worker thread while the followers
+        are fetched, so the two paginated walks overlap.
+        
         Returns:
-            list: List of non-mutual following users.
+            list: List of non-mutual following users, or None if either list
+                  could not be fetched.
         """
-        followers = self.getFollowers()
-        following = self.getFollowing()
+        # The worker gets this script run's context so its st.error calls render
+        ctx = get_script_run_ctx()
+        with ThreadPoolExecutor(max_workers=1, initializer=add_script_run_ctx, initargs=(None, ctx)) as executor:
+            followingFuture = executor.submit(self.getFollowing)
+            followers = self.getFollowers()
+            following = followingFuture.result()
+        
+        if followers is None or following is None:
+            return None
         
-        follower_usernames = set(user['login'] for user in followers)
-        non_mutual = [user for user in following if user['login'] not in follower_usernames]
+        follower_ids = {user['id'] for user in followers}
+        non_mutual = [user for user in following if user['id'] not in follower_ids]
         
         logging.info(f"Found {len(non_mutual)} non-mutual following for {self.username}")
         return non_mutual
     
+    def loadPageCache(self, kind):
+        """Load the cached pages and their ETags for one user list.
+        
+        Args:
+            kind (str): Either "followers" or "following".
+        
+        Returns:
+            dict: Maps page number (as a string) to its etag and users,
+                  or an empty dict if the file is missing/invalid.
+        """
+        try:
+            with open(self.pageCacheFiles[kind], 'r') as f:
+                return json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            return {}
+    
+    def submitWrite(self, write, *args):
+        """Run a file write on the I/O thread, logging it if it fails.
+        
+        Writes run one at a time in submission order, so callers can move on
+        to the next API request without waiting for the disk.
+        """
+        future = self.ioPool.submit(write, *args)
+        future.add_done_callback(self.logWriteError)
+    
+    def logWriteError(self, future):
+        """Log the error of a failed write submitted with submitWrite."""
+        if future.exception():
+            logging.error(f"Error writing data file: {future.exception()}")
+    
+    def atomicWrite(self, path, data):
+        """Replace a file's contents atomically.
+        
+        The data is written to a temporary file which is then renamed over the
+        target, so a crash mid-write never leaves a truncated file behind.
+        
+        Args:
+            path (str): The file to write.
+            data (str): The new file contents.
+        """
+        tmpPath = path + ".tmp"
+        with open(tmpPath, 'w') as f:
+            f.write(data)
+        os.replace(tmpPath, path)
+    
+    def savePageCache(self, kind, pageCache):
+        """Save the cached pages and their ETags for one user list to file."""
+        self.submitWrite(self.atomicWrite, self.pageCacheFiles[kind], json.dumps(pageCache, separators=JSON_SEPARATORS))
+    
+    def userFromLogin(self, login, userId):
+        """Rebuild a follower dictionary from its login and id.
+        
+        Returns:
+            dict: Follower dictionary with login, id, avatarUrl, and htmlUrl.
+        """
+        return {
+            'login': login,
+            'id': userId,
+            'avatarUrl': f"https://avatars.githubusercontent.com/u/{userId}?v=4",
+            'htmlUrl': f"https://github.com/{login}"
+        }
+    
     def saveCurrentFollowers(self, followers):
-        """Save current followers to file."""
-        with open(self.followersFile, 'w') as f:
-            json.dump(followers, f, indent=2)
+        """Save the logins and ids of the current followers to file.
+        
+        Only the fields needed for the diff are stored; the URLs can be rebuilt
+        with userFromLogin.
+        """
+        index = {
+            "logins": [user['login'] for user in followers],
+            "ids": [user['id'] for user in followers]
+        }
+        self.submitWrite(self.atomicWrite, self.followersFile, json.dumps(index, separators=JSON_SEPARATORS))
     
     def loadPreviousFollowers(self):
         """Load previously saved followers.
         
         Returns:
-            list: List of follower dictionaries or empty list if file is missing/empty.
+            dict: Maps follower id to login, or empty dict if file is missing/empty.
         """
         try:
-            if os.path.getsize(self.followersFile) == 0:
-                return []
+            # An empty file fails to parse, so no separate size check is needed
             with open(self.followersFile, 'r') as f:
+                index = json.load(f)
+        except (json.JSONDecodeError, FileNotFoundError):
+            return {}
+        
+        # Files written by older versions hold the full follower dictionaries
+        if isinstance(index, list):
+            return {user['id']: user['login'] for user in index}
+        return dict(zip(index["ids"], index["logins"]))
+    
+    def loadStats(self):
+        """Load the follower history summary.
+        
+        Returns:
+            dict: Contains totalNewFollowers, totalUnfollowers, recentNewFollowers,
+                  and recentUnfollowers; rebuilt from the history log if the
+                  file is missing/invalid.
+        """
+        try:
+            with open(self.statsFile, 'r') as f:
                 return json.load(f)
         except (json.JSONDecodeError, FileNotFoundError):
-            return []
+            return self.rebuildStats()
     
-    def updateHistory(self, newFollowers, unfollowers):
-        """Update history file with new followers and unfollowers."""
+    def rebuildStats(self):
+        """Rebuild the history summary from the history log.
+        
+        The log is streamed one line at a time, keeping only the counters and
+        the most recent events, so memory use doesn't grow with the log. A
+        compacted log starts with a summary line carrying the totals of the
+        events that were dropped.
+        
+        Returns:
+            dict: Same shape as loadStats; zeroed if there is no log.
+        """
+        if not os.path.exists(self.historyFile):
+            self.convertLegacyHistory()
+        
+        totals = {"newFollower": 0, "unfollower": 0}
+        recent = {"newFollower": deque(maxlen=RECENT_HISTORY), "unfollower": deque(maxlen=RECENT_HISTORY)}
         try:
             with open(self.historyFile, 'r') as f:
-                history = json.load(f) if os.path.getsize(self.historyFile) > 0 else {
-                    "newFollowers": [], "unfollowers": []
-                }
+                for line in f:
+                    try:
+                        event = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Skip a line cut short by an interrupted append
+                        continue
+                    if event["type"] == "summary":
+                        totals["newFollower"] += event["totalNewFollowers"]
+                        totals["unfollower"] += event["totalUnfollowers"]
+                        continue
+                    totals[event["type"]] += 1
+                    recent[event["type"]].append({"user": event["user"], "timestamp": event["timestamp"]})
+        except FileNotFoundError:
+            pass
+        
+        return {
+            "totalNewFollowers": totals["newFollower"],
+            "totalUnfollowers": totals["unfollower"],
+            "recentNewFollowers": list(recent["newFollower"]),
+            "recentUnfollowers": list(recent["unfollower"])
+        }
+    
+    def convertLegacyHistory(self):
+        """Convert the history file written by older versions to the history log.
+        
+        Older versions kept every event in {username}_history.json as two lists
+        of full follower dictionaries. The old file is left in place.
+        """
+        legacyFile = f"{self.username}_history.json"
+        try:
+            with open(legacyFile, 'r') as f:
+                history = json.load(f)
         except (json.JSONDecodeError, FileNotFoundError):
-            history = {"newFollowers": [], "unfollowers": []}
+            return
+        
+        events = [{
+            "type": eventType,
+            "user": self.userFromLogin(entry["user"]["login"], entry["user"]["id"]),
+            "timestamp": entry["timestamp"]
+        } for key, eventType in (("newFollowers", "newFollower"), ("unfollowers", "unfollower"))
+          for entry in history.get(key, [])]
+        # Timestamps sort as strings, so this restores the order across both lists
+        events.sort(key=lambda event: event["timestamp"])
+        
+        logging.info(f"Converting {legacyFile} to {self.historyFile}")
+        self.atomicWrite(self.historyFile, "".join(
+            json.dumps(event, separators=JSON_SEPARATORS) + "\n" for event in events
+        ))
+    
+    def updateHistory(self, newFollowers, unfollowers):
+        """Append new followers and unfollowers to the history log.
         
+        The log is JSON Lines, one event per line, so only the new events are
+        written. Totals and the most recent events are kept in the stats file.
+        Once the log grows past MAX_HISTORY_BYTES it is compacted down to the
+        last MAX_HISTORY_EVENTS events, after a summary line holding the totals
+        of the dropped ones.
+        """
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        max_history = 1000
+        events = [{"type": "newFollower", "user": f, "timestamp": timestamp} for f in newFollowers]
+        events.extend({"type": "unfollower", "user": f, "timestamp": timestamp} for f in unfollowers)
+        
+        stats = self.historyStats
+        stats["totalNewFollowers"] += len(newFollowers)
+        stats["totalUnfollowers"] += len(unfollowers)
+        stats["recentNewFollowers"].extend({"user": f, "timestamp": timestamp} for f in newFollowers)
+        stats["recentUnfollowers"].extend({"user": f, "timestamp": timestamp} for f in unfollowers)
+        stats["recentNewFollowers"] = stats["recentNewFollowers"][-RECENT_HISTORY:]
+        stats["recentUnfollowers"] = stats["recentUnfollowers"][-RECENT_HISTORY:]
+        
+        # Serialize here so the I/O thread never sees the stats mid-update
+        lines = "".join(json.dumps(event, separators=JSON_SEPARATORS) + "\n" for event in events)
+        self.submitWrite(self.writeHistory, lines, json.dumps(stats, separators=JSON_SEPARATORS))
+    
+    def writeHistory(self, lines, statsData):
+        """Append lines to the history log and save the stats summary.
         
-        history["newFollowers"].extend([{"user": f, "timestamp": timestamp} for f in newFollowers])
-        history["unfollowers"].extend([{"user": f, "timestamp": timestamp} for f in unfollowers])
+        Runs on the I/O thread; see updateHistory.
+        """
+        with open(self.historyFile, 'a') as f:
+            f.write(lines)
+            logSize = f.tell()
         
-        history["newFollowers"] = history["newFollowers"][-max_history:]
-        history["unfollowers"] = history["unfollowers"][-max_history:]
+        if logSize > MAX_HISTORY_BYTES:
+            with open(self.historyFile, 'r') as f:
+                tail = deque(f, maxlen=MAX_HISTORY_EVENTS)
+            
+            # The totals of the dropped events go into a leading summary line, so
+            # rebuildStats still gets the lifetime totals if the stats file is lost
+            kept = []
+            keptTotals = {"newFollower": 0, "unfollower": 0}
+            for line in tail:
+                try:
+                    eventType = json.loads(line)["type"]
+                except json.JSONDecodeError:
+                    continue
+                if eventType != "summary":
+                    keptTotals[eventType] += 1
+                    kept.append(line)
+            
+            stats = json.loads(statsData)
+            summary = {
+                "type": "summary",
+                "totalNewFollowers": stats["totalNewFollowers"] - keptTotals["newFollower"],
+                "totalUnfollowers": stats["totalUnfollowers"] - keptTotals["unfollower"]
+            }
+            self.atomicWrite(self.historyFile, json.dumps(summary, separators=JSON_SEPARATORS) + "\n" + "".join(kept))
         
-        with open(self.historyFile, 'w') as f:
-            json.dump(history, f, indent=2)
+        self.atomicWrite(self.statsFile, statsData)
     
     def checkChanges(self):
         """Check for new followers and unfollowers.
         
+        Within COUNT_PROBE_WINDOW seconds of a full check, the profile's follower
+        count is fetched first and the paginated walk is skipped if it still
+        matches the snapshot. A follow and an unfollow in that window cancel
+        out and are picked up by the next full check.
+        
         Returns:
-            dict: Contains newFollowers, unfollowers, and totalFollowers.
+            dict: Contains newFollowers, unfollowers, and totalFollowers, or None
+                  if the followers could not be fetched. Nothing is saved then.
         """
         logging.info(f"Checking changes for {self.username}")
+        if time.time() - self.lastFullCheck < COUNT_PROBE_WINDOW:
+            followerCount = self.getFollowerCount()
+            if followerCount == len(self.previousFollowers):
+                logging.info(f"Follower count unchanged ({followerCount}), skipping full check")
+                return {"newFollowers": [], "unfollowers": [], "totalFollowers": followerCount}
+        
+        # Walk the list even if it was fetched within ttlSeconds, so a change the
+        # probe just spotted isn't answered from the cache
+        self.userCaches["followers"] = None
         currentFollowers = self.getFollowers()
-        previousFollowers = self.loadPreviousFollowers()
+        if currentFollowers is None:
+            # Diffing against nothing would report every follower as gone
+            return None
+        self.lastFullCheck = time.time()
+        previousFollowers = self.previousFollowers
         
-        currentUsernames = set(user['login'] for user in currentFollowers)
-        previousUsernames = set(user['login'] for user in previousFollowers)
+        # Diff on ids: they hash faster than logins and survive username changes
+        currentById = {user['id']: user for user in currentFollowers}
         
-        newFollowers = [user for user in currentFollowers if user['login'] not in previousUsernames]
-        unfollowers = [user for user in previousFollowers if user['login'] not in currentUsernames]
+        newFollowers = [currentById[userId] for userId in currentById.keys() - previousFollowers.keys()]
+        unfollowers = [self.userFromLogin(previousFollowers[userId], userId)
+                       for userId in previousFollowers.keys() - currentById.keys()]
         
-        self.saveCurrentFollowers(currentFollowers)
-        self.updateHistory(newFollowers, unfollowers)
+        # Nothing to persist when the follower list is unchanged
+        if newFollowers or unfollowers:
+            self.previousFollowers = {user['id']: user['login'] for user in currentFollowers}
+            self.saveCurrentFollowers(currentFollowers)
+            self.updateHistory(newFollowers, unfollowers)
         
         return {
             "newFollowers": newFollowers,
@@ -231,29 +673,10 @@ class GitHubTracker:
             dict: Contains totalFollowers, totalNewFollowers, totalUnfollowers,
                   recentNewFollowers, and recentUnfollowers.
         """
-        try:
-            with open(self.historyFile, 'r') as f:
-                history = json.load(f) if os.path.getsize(self.historyFile) > 0 else {
-                    "newFollowers": [], "unfollowers": []
-                }
-                
-            currentFollowers = self.loadPreviousFollowers()
-            
-            return {
-                "totalFollowers": len(currentFollowers),
-                "totalNewFollowers": len(history["newFollowers"]),
-                "totalUnfollowers": len(history["unfollowers"]),
-                "recentNewFollowers": history["newFollowers"][-5:],
-                "recentUnfollowers": history["unfollowers"][-5:]
-            }
-        except (json.JSONDecodeError, FileNotFoundError):
-            return {
-                "totalFollowers": 0,
-                "totalNewFollowers": 0,
-                "totalUnfollowers": 0,
-                "recentNewFollowers": [],
-                "recentUnfollowers": []
-            }
+        return {
+            "totalFollowers": len(self.previousFollowers),
+            **self.historyStats
+        }
 
 def main():
     st.title("GitHub Follower Tracker")
@@ -302,6 +725,7 @@ def main():
                 st.rerun()
         
         if st.button("Change User"):
+            st.session_state.tracker.close()
             st.session_state.tracker = None
             st.session_state.view = 'input'
             st.rerun()
@@ -309,26 +733,36 @@ def main():
     # Changes view
     elif st.session_state.view == 'changes':
         st.subheader("Follower Changes")
-        with st.spinner("Checking for changes..."):
-            changes = st.session_state.tracker.checkChanges()
-        
-        if changes["newFollowers"]:
-            st.markdown(f"### 🎉 New Followers ({len(changes['newFollowers'])})")
-            for follower in changes["newFollowers"]:
-                st.markdown(f"- [{follower['login']}]({follower['htmlUrl']})")
-        else:
-            st.write("No new followers this time.")
-        
-        if changes["unfollowers"]:
-            st.markdown(f"### 👋 Unfollowers ({len(changes['unfollowers'])})")
-            for unfollower in changes["unfollowers"]:
-                st.markdown(f"- [{unfollower['login']}]({unfollower['htmlUrl']})")
+        # Reruns within this view, such as the one triggered by "Back to Menu",
+        # reuse the result instead of checking again
+        if 'changes' not in st.session_state:
+            with st.spinner("Checking for changes..."):
+                st.session_state.changes = st.session_state.tracker.checkChanges()
+        changes = st.session_state.changes
+        
+        if changes is None:
+            st.write("Could not check for changes right now. Please try again later.")
         else:
-            st.write("Nobody unfollowed you. Nice!")
-        
-        st.write(f"**Total Followers:** {changes['totalFollowers']}")
+            if changes["newFollowers"]:
+                st.markdown(f"### 🎉 New Followers ({len(changes['newFollowers'])})")
+                st.markdown("\n".join(
+                    f"- [{follower['login']}]({follower['htmlUrl']})" for follower in changes["newFollowers"]
+                ))
+            else:
+                st.write("No new followers this time.")
+            
+            if changes["unfollowers"]:
+                st.markdown(f"### 👋 Unfollowers ({len(changes['unfollowers'])})")
+                st.markdown("\n".join(
+                    f"- [{unfollower['login']}]({unfollower['htmlUrl']})" for unfollower in changes["unfollowers"]
+                ))
+            else:
+                st.write("Nobody unfollowed you. Nice!")
+            
+            st.write(f"**Total Followers:** {changes['totalFollowers']}")
         
         if st.button("Back to Menu"):
+            del st.session_state.changes
             st.session_state.view = 'menu'
             st.rerun()
     
@@ -343,13 +777,17 @@ def main():
         
         if stats['recentNewFollowers']:
             st.markdown("### 🆕 Recent New Followers")
-            for follower in stats['recentNewFollowers']:
-                st.markdown(f"- [{follower['user']['login']}]({follower['user']['htmlUrl']}) - {follower['timestamp']}")
+            st.markdown("\n".join(
+                f"- [{follower['user']['login']}]({follower['user']['htmlUrl']}) - {follower['timestamp']}"
+                for follower in stats['recentNewFollowers']
+            ))
         
         if stats['recentUnfollowers']:
             st.markdown("### 🔄 Recent Unfollowers")
-            for unfollower in stats['recentUnfollowers']:
-                st.markdown(f"- [{unfollower['user']['login']}]({unfollower['user']['htmlUrl']}) - {unfollower['timestamp']}")
+            st.markdown("\n".join(
+                f"- [{unfollower['user']['login']}]({unfollower['user']['htmlUrl']}) - {unfollower['timestamp']}"
+                for unfollower in stats['recentUnfollowers']
+            ))
         
         if st.button("Back to Menu"):
             st.session_state.view = 'menu'
@@ -358,17 +796,21 @@ def main():
     # Non-mutual view
     elif st.session_state.view == 'nonMutual':
         st.subheader("Non-Mutual Following")
-        with st.spinner("Checking non-mutual following..."):
-            non_mutual = st.session_state.tracker.getNonMutualFollowing()
-        
-        if non_mutual:
+        if 'nonMutual' not in st.session_state:
+            with st.spinner("Checking non-mutual following..."):
+                st.session_state.nonMutual = st.session_state.tracker.getNonMutualFollowing()
+        non_mutual = st.session_state.nonMutual
+        
+        if non_mutual is None:
+            st.write("Could not check non-mutual following right now. Please try again later.")
+        elif non_mutual:
             st.markdown(f"### 👤 Users you follow but who don’t follow you back ({len(non_mutual)})")
-            for user in non_mutual:
-                st.markdown(f"- [{user['login']}]({user['htmlUrl']})")
+            st.markdown("\n".join(f"- [{user['login']}]({user['htmlUrl']})" for user in non_mutual))
         else:
             st.write("All users you follow also follow you back!")
         
         if st.button("Back to Menu"):
+            del st.session_state.nonMutual
             st.session_state.view = 'menu'
             st.rerun()
 